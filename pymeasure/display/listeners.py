@@ -23,9 +23,11 @@
 #
 
 import logging
+from collections import deque
 
 from .Qt import QtCore
 from .thread import StoppableQThread
+from ..experiment.listeners import decode_message
 from ..experiment.procedure import Procedure
 
 log = logging.getLogger(__name__)
@@ -69,15 +71,16 @@ class QListener(StoppableQThread):
         self.poller = zmq.Poller()
         self.poller.register(self.subscriber, zmq.POLLIN)
         self.timeout = timeout
+        self._pending = deque()
 
     def receive(self, flags=0):
-        topic, record = self.subscriber.recv_serialized(
-            deserialize=lambda msg: (msg[0].decode(), cloudpickle.loads(msg[1])),
-            flags=flags
-        )
-        return topic, record
+        if not self._pending:
+            self._pending.extend(decode_message(self.subscriber.recv_multipart(flags=flags)))
+        return self._pending.popleft()
 
     def message_waiting(self):
+        if self._pending:
+            return True
         return self.poller.poll(self.timeout)
 
     def __repr__(self):
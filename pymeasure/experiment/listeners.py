@@ -23,7 +23,11 @@
 #
 
 import logging
+import pickle
+import struct
+from collections import deque
 from logging import StreamHandler, FileHandler
+from threading import Event, Thread
 
 from ..log import QueueListener
 from ..thread import StoppableThread
@@ -39,6 +43,28 @@ except ImportError:
     cloudpickle = None
     log.warning("ZMQ and cloudpickle are required for TCP communication")
 
+# First byte of the frame announcing struct-packed records, which can not
+# be confused with a pickle (starting with the PROTO opcode 0x80)
+PACKED_RECORDS_MARKER = b'\x00'
+
+
+def decode_message(frames):
+    """ Decodes the frames of a message emitted by a
+    :class:`~pymeasure.experiment.workers.Worker` into a list of
+    (topic, record) tuples.
+
+    The first frame holds the topic. It is followed either by one pickled
+    record per frame, or by a header frame with the columns and struct
+    format of the records and one struct-packed record per frame.
+    """
+    topic = frames[0].decode()
+    records = frames[1:]
+    if records and records[0][:1] == PACKED_RECORDS_MARKER:
+        columns, fmt = pickle.loads(records[0][1:])
+        row_struct = struct.Struct('<' + fmt)
+        return [(topic, dict(zip(columns, row_struct.unpack(frame)))) for frame in records[1:]]
+    return [(topic, cloudpickle.loads(frame)) for frame in records]
+
 
 class Monitor(QueueListener):
     def __init__(self, results, queue):
@@ -51,6 +77,9 @@ class Monitor(QueueListener):
 class Listener(StoppableThread):
     """Base class for Threads that need to listen for messages on
     a ZMQ TCP port and can be stopped by a thread-safe method call
+
+    A single message may carry several records of the same topic,
+    which are returned one by one by :meth:`receive`.
     """
 
     def __init__(self, port, topic='', timeout=0.01):
@@ -76,16 +105,17 @@ class Listener(StoppableThread):
         self.poller = zmq.Poller()
         self.poller.register(self.subscriber, zmq.POLLIN)
         self.timeout = timeout
+        self._pending = deque()
 
     def receive(self, flags=0):
-        topic, record = self.subscriber.recv_serialized(
-            deserialize=lambda msg: (msg[0].decode(), cloudpickle.loads(msg[1])),
-            flags=flags
-        )
-        return topic, record
+        if not self._pending:
+            self._pending.extend(decode_message(self.subscriber.recv_multipart(flags=flags)))
+        return self._pending.popleft()
 
     def message_waiting(self):
         """Check if we have a message, wait at most until timeout."""
+        if self._pending:
+            return True
         return self.poller.poll(self.timeout * 1000)  # poll timeout is in ms
 
     def __repr__(self):
@@ -93,26 +123,97 @@ class Listener(StoppableThread):
             self.__class__.__name__, self.port, self.topic, self.should_stop())
 
 
+class BufferedFileHandler(FileHandler):
+    """ FileHandler that writes records without flushing the stream after
+    each of them, leaving flushing to explicit :meth:`flush` calls. The file
+    is opened with a buffer of `buffer_size` bytes, so that the rows written
+    between two flushes reach the disk in a few large writes.
+    """
+
+    def __init__(self, filename, buffer_size=1024 * 1024, **kwargs):
+        self.buffer_size = buffer_size
+        super().__init__(filename, **kwargs)
+
+    def _open(self):
+        kwargs = {'encoding': self.encoding}
+        if getattr(self, 'errors', None) is not None:
+            kwargs['errors'] = self.errors
+        return open(self.baseFilename, self.mode, buffering=self.buffer_size, **kwargs)
+
+    def emit(self, record):
+        try:
+            self.write_line(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+    def write_line(self, line):
+        """ Writes an already formatted line to the file """
+        self.acquire()
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(line + self.terminator)
+        finally:
+            self.release()
+
+
 class Recorder(QueueListener):
     """ Recorder loads the initial Results for a filepath and
     appends data by listening for it over a queue. The queue
     ensures that no data is lost between the Recorder and Worker.
+
+    Records are formatted once and written to all data files as they are
+    handled, while the files are flushed from a separate thread every
+    `flush_interval` seconds and when the Recorder is stopped.
     """
 
-    def __init__(self, results, queue, **kwargs):
+    def __init__(self, results, queue, flush_interval=0.1, **kwargs):
         """ Constructs a Recorder to record the Procedure data into
         the file path, by waiting for data on the subscription port
         """
         handlers = []
         for filename in results.data_filenames:
-            fh = FileHandler(filename=filename, **kwargs)
+            fh = BufferedFileHandler(filename=filename, **kwargs)
             fh.setFormatter(results.formatter)
             fh.setLevel(logging.NOTSET)
             handlers.append(fh)
 
         super().__init__(queue, *handlers)
 
+        self.formatter = results.formatter
+        self.flush_interval = flush_interval
+        self._should_stop_flushing = Event()
+        self._flusher = None
+
+    def handle(self, record):
+        try:
+            line = self.formatter.format(record)
+        except Exception:
+            log.exception("Recorder could not format the record %r", record)
+            return
+        for handler in self.handlers:
+            handler.write_line(line)
+
+    def start(self):
+        super().start()
+        self._flusher = Thread(target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+
+    def _flush_periodically(self):
+        while not self._should_stop_flushing.is_set():
+            self._should_stop_flushing.wait(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        for handler in self.handlers:
+            handler.flush()
+
     def stop(self):
+        if self._flusher is not None:
+            self._should_stop_flushing.set()
+            self._flusher.join()
+            self._flusher = None
+
         for handler in self.handlers:
             handler.close()
 
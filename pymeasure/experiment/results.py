@@ -138,7 +138,7 @@ class CSVFormatter(logging.Formatter):
         :type record: dict
         :return: a string
         """
-        return self.delimiter.join('{}'.format(record[x]) for x in self.columns)
+        return self.delimiter.join([format(record[x]) for x in self.columns])
 
     def format_header(self):
         return self.delimiter.join(self.columns)
@@ -22,12 +22,16 @@
 # THE SOFTWARE.
 #
 
+import io
 import logging
+import pickle
+import struct
 import time
 import traceback
-from queue import Queue
+from queue import Queue, SimpleQueue
+from threading import Condition, Thread
 
-from .listeners import Recorder
+from .listeners import Recorder, PACKED_RECORDS_MARKER
 from .procedure import Procedure
 from .results import Results
 from ..thread import StoppableThread
@@ -48,8 +52,31 @@ class Worker(StoppableThread):
     """ Worker runs the procedure and emits information about
     the procedure and its status over a ZMQ TCP port. In a child
     thread, a Recorder is run to write the results to
+
+    Consecutive 'results' records are coalesced into a single multipart
+    ZMQ message of at most :attr:`EMIT_BATCH_SIZE` records, which is sent
+    once the batch is full, :attr:`EMIT_BATCH_WINDOW` seconds after its first
+    record (also when no further record is emitted meanwhile), or when a record
+    of any other topic is emitted. Results records which are
+    dicts of the ``DATA_COLUMNS`` holding only int and float values are
+    struct-packed instead of pickled, with the column names and row format
+    sent once per message.
+
+    'progress' records are emitted at most once every
+    :attr:`PROGRESS_INTERVAL` seconds, except for a progress of 100%.
+
+    Before running the procedure, the Worker waits for at most
+    :attr:`SUBSCRIBER_TIMEOUT` seconds until a subscriber is connected,
+    so that the first messages are not lost.
     """
 
+    EMIT_BATCH_SIZE = 64
+    EMIT_BATCH_WINDOW = 0.05
+    PROGRESS_INTERVAL = 1 / 30
+    SUBSCRIBER_TIMEOUT = 0.3
+
+    _STRUCT_CODES = {float: 'd', int: 'q'}
+
     def __init__(self, results, log_queue=None, log_level=logging.INFO, port=None):
         """ Constructs a Worker to perform the Procedure
         defined in the file at the filepath
@@ -64,9 +91,11 @@ class Worker(StoppableThread):
         self.results.procedure.status = Procedure.QUEUED
 
         self.recorder = None
-        self.recorder_queue = Queue()
+        # Single producer/single consumer hand-offs between threads, so the
+        # unbounded C-implemented SimpleQueue is sufficient
+        self.recorder_queue = SimpleQueue()
 
-        self.monitor_queue = Queue()
+        self.monitor_queue = SimpleQueue()
         if log_queue is None:
             log_queue = Queue()
         self.log_queue = log_queue
@@ -81,15 +110,39 @@ class Worker(StoppableThread):
 
         self.context = None
         self.publisher = None
+        self._topic_frames = {}
+        self._emit_buf = []
+        self._emit_header = None
+        self._emit_deadline = 0
+        # guards the socket and the batch, which are also flushed by a thread
+        # once the batch window elapses without further records
+        self._emit_condition = Condition()
+        self._flusher = None
+        self._stop_flushing = False
+        self._columns = tuple(self.results.procedure.DATA_COLUMNS)
+        self._row_structs = {}
+        self._cloudpickle_buffer = None
+        self._cloudpickler = None
+        self._last_progress_t = 0.
+        self._emitters = {
+            'results': self._emit_results,
+            'status': self._emit_status,
+            'progress': self._emit_progress,
+        }
         if self.port is not None and zmq is not None:
             try:
-                self.context = zmq.Context()
+                # The process-wide context is shared with other Workers, and
+                # left to pyzmq at exit, so that open sockets do not block it
+                self.context = zmq.Context.instance(io_threads=2)
                 log.debug("Worker ZMQ Context: %r" % self.context)
-                self.publisher = self.context.socket(zmq.PUB)
+                self.publisher = self.context.socket(zmq.XPUB)
+                self.publisher.setsockopt(zmq.XPUB_VERBOSE, 1)
+                self.publisher.setsockopt(zmq.SNDHWM, 100000)
+                self.publisher.setsockopt(zmq.LINGER, 1000)
+                self.publisher.setsockopt(zmq.TCP_KEEPALIVE, 1)
+                self.publisher.setsockopt(zmq.IMMEDIATE, 1)
                 self.publisher.bind('tcp://*:%d' % self.port)
                 log.info("Worker connected to tcp://*:%d" % self.port)
-                # wait so that the socket will be ready before starting to emit messages
-                time.sleep(0.3)
             except Exception:
                 log.exception("Couldn't establish ZMQ publisher!")
                 self.context = None
@@ -105,19 +158,139 @@ class Worker(StoppableThread):
 
     def emit(self, topic, record):
         """ Emits data of some topic over TCP """
-        log.debug("Emitting message: %s %s", topic, record)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Emitting message: %s %s", topic, record)
+        self._emitters.get(topic, self._publish)(topic, record)
+
+    def _emit_results(self, topic, record):
+        if self.publisher is not None:
+            try:
+                self._buffer_result(record)
+            except (NameError, AttributeError):
+                pass  # No dumps defined
+        self.recorder.handle(record)
+
+    def _emit_progress(self, topic, record):
+        if record < 100.:
+            now = time.monotonic()
+            if now - self._last_progress_t < self.PROGRESS_INTERVAL:
+                return
+            self._last_progress_t = now
+        self._emit_status(topic, record)
+
+    def _emit_status(self, topic, record):
+        self._publish(topic, record)
+        self.monitor_queue.put((topic, record))
+
+    def _publish(self, topic, record):
+        """ Sends a single record, after any buffered results records """
+        if self.publisher is not None:
+            try:
+                frames = (self._topic_frame(topic), self._dumps(record))
+                with self._emit_condition:
+                    self._flush_results()
+                    self.publisher.send_multipart(frames, copy=False, track=False)
+            except (NameError, AttributeError):
+                pass  # No dumps defined
+
+    def _wait_for_subscriber(self):
+        """ Waits until the publisher receives a subscription message """
+        if self.publisher.poll(self.SUBSCRIBER_TIMEOUT * 1000, zmq.POLLIN):
+            self.publisher.recv()
+        else:
+            log.debug("No subscriber connected to tcp://*:%d", self.port)
+
+    def _buffer_result(self, record):
+        """ Adds a results record to the batch, sending it when full or expired """
+        header, frame = self._pack_result(record)
+        with self._emit_condition:
+            if self._emit_buf and header != self._emit_header:
+                self._flush_results()
+            now = time.monotonic()
+            if not self._emit_buf:
+                self._emit_header = header
+                self._emit_deadline = now + self.EMIT_BATCH_WINDOW
+                self._emit_condition.notify()
+            self._emit_buf.append(frame)
+            if len(self._emit_buf) >= self.EMIT_BATCH_SIZE or now >= self._emit_deadline:
+                self._flush_results()
+
+    def _flush_when_idle(self):
+        """ Sends each batch once its window has elapsed without it being sent
+        by further records, until the Worker shuts down
+        """
+        with self._emit_condition:
+            while not self._stop_flushing:
+                if not self._emit_buf:
+                    self._emit_condition.wait()
+                    continue
+                timeout = self._emit_deadline - time.monotonic()
+                if timeout > 0:
+                    self._emit_condition.wait(timeout)
+                else:
+                    self._flush_results()
 
+    def _pack_result(self, record):
+        """ Returns the header frame and the struct-packed row of a numeric
+        results record, or no header and the pickled record otherwise
+        """
+        # keys outside of DATA_COLUMNS would be lost when packing
+        if not isinstance(record, dict) or len(record) != len(self._columns):
+            return None, self._dumps(record)
+        try:
+            values = [record[column] for column in self._columns]
+            fmt = ''.join([self._STRUCT_CODES[type(value)] for value in values])
+        except KeyError:
+            return None, self._dumps(record)
+
+        try:
+            header, row_struct = self._row_structs[fmt]
+        except KeyError:
+            header = PACKED_RECORDS_MARKER + pickle.dumps((self._columns, fmt))
+            row_struct = struct.Struct('<' + fmt)
+            self._row_structs[fmt] = header, row_struct
+        try:
+            return header, row_struct.pack(*values)
+        except struct.error:  # int out of the 64-bit range
+            return None, self._dumps(record)
+
+    def _flush_results(self):
+        """ Sends the buffered results records as a single multipart message,
+        which must be called with the emit condition held
+        """
+        if self._emit_buf:
+            frames = [self._topic_frame('results')]
+            if self._emit_header is not None:
+                frames.append(self._emit_header)
+            self.publisher.send_multipart(frames + self._emit_buf, copy=False, track=False)
+            self._emit_buf = []
+
+    def _topic_frame(self, topic):
+        """ Returns the encoded topic frame, which is cached per topic """
+        try:
+            return self._topic_frames[topic]
+        except KeyError:
+            frame = self._topic_frames[topic] = topic.encode()
+            return frame
+
+    def _dumps(self, record):
+        """ Serializes a record with the C pickler, falling back to
+        cloudpickle for objects that plain pickle cannot handle (e.g. closures)
+        """
         try:
-            self.publisher.send_serialized(
-                record,
-                serialize=lambda rec: (topic.encode(), cloudpickle.dumps(rec)),
-            )
-        except (NameError, AttributeError):
-            pass  # No dumps defined
-        if topic == 'results':
-            self.recorder.handle(record)
-        elif topic == 'status' or topic == 'progress':
-            self.monitor_queue.put((topic, record))
+            return pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            pass
+
+        if self._cloudpickler is None:
+            self._cloudpickle_buffer = io.BytesIO()
+            self._cloudpickler = cloudpickle.CloudPickler(
+                self._cloudpickle_buffer, protocol=pickle.HIGHEST_PROTOCOL)
+        self._cloudpickle_buffer.seek(0)
+        self._cloudpickle_buffer.truncate()
+        self._cloudpickler.clear_memo()
+        self._cloudpickler.dump(record)
+        return self._cloudpickle_buffer.getvalue()
 
     def handle_abort(self):
         log.exception("User stopped Worker execution prematurely")
@@ -145,11 +318,16 @@ class Worker(StoppableThread):
         self.recorder.stop()
         self.monitor_queue.put(None)
         if self.context is not None:
-            # Cleanly close down ZMQ context and associated socket
-            # For some reason, we need to close the socket before the
-            # context, otherwise context termination hangs.
-            self.publisher.close()
-            self.context.term()
+            with self._emit_condition:
+                self._stop_flushing = True
+                self._emit_condition.notify()
+                self._flush_results()
+                # The context is shared with other Workers, so only the socket
+                # is closed
+                self.publisher.close()
+            if self._flusher is not None:
+                self._flusher.join()
+                self._flusher = None
 
     def run(self):
         log.info("Worker thread started")
@@ -159,12 +337,15 @@ class Worker(StoppableThread):
         self.recorder = Recorder(self.results, self.recorder_queue)
         self.recorder.start()
 
-        # locals()[self.procedures_file] = __import__(self.procedures_file)
-
         # route Procedure methods & log
         self.procedure.should_stop = self.should_stop
         self.procedure.emit = self.emit
 
+        if self.publisher is not None:
+            self._wait_for_subscriber()
+            self._flusher = Thread(target=self._flush_when_idle, daemon=True)
+            self._flusher.start()
+
         log.info("Worker started running an instance of %r", self.procedure.__class__.__name__)
         self.update_status(Procedure.RUNNING)
         self.emit('progress', 0.)
@@ -34,6 +34,49 @@ log = logging.getLogger(__name__)
 log.addHandler(logging.NullHandler())
 
 
+def _value_index(values):
+    """ Returns a function that gives the index of a value in a list, tuple or
+    range of values. For lists and tuples of hashable values, the indices are
+    prepared once in a dict instead of searching the values on every call.
+    """
+    if not isinstance(values, (list, tuple)):
+        return values.index
+    indices = {}
+    try:
+        for i, v in enumerate(values):
+            indices.setdefault(v, i)
+    except TypeError:  # unhashable values
+        return values.index
+
+    def index(value):
+        try:
+            return indices[value]
+        except (KeyError, TypeError):
+            return values.index(value)  # raises the usual ValueError
+
+    return index
+
+
+def _mapped_command(set_command):
+    """ Returns a function that formats the set command with a mapped value.
+    As a mapped control only writes a few distinct values, the command of each
+    value is formatted once and then looked up.
+    """
+    commands = {}
+
+    def command(value):
+        key = (type(value), value)  # 1, 1.0 and True are equal, but format differently
+        try:
+            return commands[key]
+        except KeyError:
+            commands[key] = set_command % value
+            return commands[key]
+        except TypeError:  # unhashable value
+            return set_command % value
+
+    return command
+
+
 class Instrument(object):
     """ The base class for all Instrument definitions.
 
@@ -178,6 +221,10 @@ class Instrument(object):
         if map_values and isinstance(values, dict):
             # Prepare the inverse values for performance
             inverse = {v: k for k, v in values.items()}
+        elif map_values and isinstance(values, (list, tuple, range)):
+            # Prepare the indices of the values for performance
+            index = _value_index(values)
+        command = _mapped_command(set_command)
 
         def fget(self):
             vals = self.values(get_command, **kwargs)
@@ -205,7 +252,7 @@ class Instrument(object):
             if not map_values:
                 pass
             elif isinstance(values, (list, tuple, range)):
-                value = values.index(value)
+                value = index(value)
             elif isinstance(values, dict):
                 value = values[value]
             else:
@@ -213,7 +260,7 @@ class Instrument(object):
                     'Values of type `{}` are not allowed '
                     'for Instrument.control'.format(type(values))
                 )
-            self.write(set_command % value)
+            self.write(command(value) if map_values else set_command % value)
             if check_set_errors:
                 self.check_errors()
 
@@ -295,6 +342,11 @@ class Instrument(object):
         :param check_set_errors: Toggles checking errors after setting
         """
 
+        if map_values and isinstance(values, (list, tuple, range)):
+            # Prepare the indices of the values for performance
+            index = _value_index(values)
+        command = _mapped_command(set_command)
+
         def fget(self):
             raise LookupError("Instrument.setting properties can not be read.")
 
@@ -303,7 +355,7 @@ class Instrument(object):
             if not map_values:
                 pass
             elif isinstance(values, (list, tuple, range)):
-                value = values.index(value)
+                value = index(value)
             elif isinstance(values, dict):
                 value = values[value]
             else:
@@ -311,7 +363,7 @@ class Instrument(object):
                     'Values of type `{}` are not allowed '
                     'for Instrument.control'.format(type(values))
                 )
-            self.write(set_command % value)
+            self.write(command(value) if map_values else set_command % value)
             if check_set_errors:
                 self.check_errors()
 
@@ -78,6 +78,7 @@ class SR830(Instrument):
     EXPANSION_VALUES = [1, 10, 100]
     RESERVE_VALUES = ['High Reserve', 'Normal', 'Low Noise']
     CHANNELS = ['X', 'Y', 'R']
+    _CHANNEL_INDICES = {channel: index + 1 for index, channel in enumerate(CHANNELS)}
     INPUT_CONFIGS = ['A', 'A - B', 'I (1 MOhm)', 'I (100 MOhm)']
     INPUT_GROUNDINGS = ['Float', 'Ground']
     INPUT_COUPLINGS = ['AC', 'DC']
@@ -340,20 +341,23 @@ class SR830(Instrument):
     def auto_phase(self):
         self.write("APHS")
 
+    def _channel_index(self, channel):
+        """ Returns the index (X=1, Y=2, R=3) of the channel used in commands """
+        try:
+            return self._CHANNEL_INDICES[channel]
+        except KeyError:
+            raise ValueError('SR830 channel is invalid')
+
     def auto_offset(self, channel):
         """ Offsets the channel (X, Y, or R) to zero """
-        if channel not in self.CHANNELS:
-            raise ValueError('SR830 channel is invalid')
-        channel = self.CHANNELS.index(channel) + 1
+        channel = self._channel_index(channel)
         self.write("AOFF %d" % channel)
 
     def get_scaling(self, channel):
         """ Returns the offset precent and the exapnsion term
         that are used to scale the channel in question
         """
-        if channel not in self.CHANNELS:
-            raise ValueError('SR830 channel is invalid')
-        channel = self.CHANNELS.index(channel) + 1
+        channel = self._channel_index(channel)
         offset, expand = self.ask("OEXP? %d" % channel).split(',')
         return float(offset), self.EXPANSION_VALUES[int(expand)]
 
@@ -362,9 +366,7 @@ class SR830(Instrument):
         certain precent (-105% to 105%) of the signal, with
         an optional expansion term (0, 10=1, 100=2)
         """
-        if channel not in self.CHANNELS:
-            raise ValueError('SR830 channel is invalid')
-        channel = self.CHANNELS.index(channel) + 1
+        channel = self._channel_index(channel)
         expand = discreteTruncate(expand, self.EXPANSION_VALUES)
         self.write("OEXP %i,%.2f,%i" % (channel, precent, expand))
 
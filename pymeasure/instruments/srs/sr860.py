@@ -22,11 +22,114 @@
 # THE SOFTWARE.
 #
 
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
 from pymeasure.instruments.validators import strict_discrete_set, \
-    truncated_discrete_set, truncated_range
+    truncated_range, strict_range
 from pymeasure.instruments import Instrument
 
 
+def _truncated_sorted_set(value, values):
+    """ Equivalent of :func:`~pymeasure.instruments.validators.truncated_discrete_set`
+    for values that are already sorted in ascending order, which finds the value
+    by a binary search instead of sorting and scanning the values on every call.
+    """
+    return values[min(bisect_left(values, value), len(values) - 1)]
+
+
+def _indices(values):
+    """ Returns a dict mapping each of the values to its index, to be used as
+    the values of a mapped control, which makes validating and mapping a value
+    a dict lookup instead of searching the list.
+    """
+    return {value: index for index, value in enumerate(values)}
+
+
+def _data_channel_parameters(parameters):
+    """ Returns the controls assigning a parameter to each of the four data
+    channels, whose docstrings list the allowed `parameters`.
+    """
+    return [Instrument.control(
+        "CDSP? %d" % i, "CDSP %d, %%i" % i,
+        """A integer property that assigns a parameter to data channel %d(%s).
+        This parameters can be set. Allowed values are:%s""" % (i + 1, color, parameters),
+        validator=strict_discrete_set,
+        values=range(0, 16)
+    ) for i, color in enumerate(['green', 'blue', 'yellow', 'orange'])]
+
+
+def _strip_chart_controls(on_off_values):
+    """ Returns the controls turning the strip chart graph of each of the four
+    data channels off or on, which take the `on_off_values`.
+    """
+    values = _indices(on_off_values)
+    return [Instrument.control(
+        "CGRF? %d" % i, "CGRF %d, %%i" % i,
+        """A integer property that turns the strip chart graph of data channel %d off(i=0)
+        or on(i=1).""" % (i + 1),
+        validator=strict_discrete_set,
+        values=values,
+        map_values=True
+    ) for i in range(4)]
+
+
+class _CommandRecorder:
+    """ Stands in for an SR860 in the setters of its properties, recording the
+    commands they write while sharing the remembered setting values.
+    """
+
+    def __init__(self, settings):
+        self._settings = settings
+        self.commands = []
+
+    def write(self, command):
+        self.commands.append(command)
+
+
+def _written_value(fmt, values):
+    """ Returns a function giving the value that the instrument holds after
+    being set to a value, which is truncated to the range `values` and sent
+    formatted with `fmt`.
+    """
+    return lambda value: float(fmt % truncated_range(value, values))
+
+
+def _remember_setting(prop, name, cached_read=False, invalidates=(), written=None):
+    """ Returns a copy of the property `prop` whose setter skips the write when
+    the value equals the last value set or read, which is remembered on the
+    instrument under `name`.
+
+    :param cached_read: return the remembered value instead of querying it
+    :param invalidates: names of the remembered values that setting the
+        property makes outdated
+    :param written: function of a value giving the value that the instrument
+        holds after it is set, e.g. after truncation and rounding by the set
+        command, which is remembered and compared instead of the value, so
+        that values which the instrument can not tell apart are considered equal
+    """
+    def fget(self):
+        if cached_read and name in self._settings:
+            return self._settings[name]
+        value = prop.fget(self)
+        self._settings[name] = value
+        return value
+
+    def fset(self, value):
+        remembered = value if written is None else written(value)
+        if name in self._settings and self._settings[name] == remembered:
+            return
+        prop.fset(self, value)
+        self._settings[name] = remembered
+        for other in invalidates:
+            self._settings.pop(other, None)
+
+    fget.__doc__ = prop.__doc__
+    return property(fget, fset if prop.fset is not None else None)
+
+
 class SR860(Instrument):
 
     SENSITIVITIES = [
@@ -61,6 +164,8 @@ class SR860(Instrument):
                       '5=Aux IN2', '6=Aux IN3', '7=Aux IN4', '8=Xnoise', '9=Ynoise',
                       '10=AUXOut1', '11=AuxOut2', '12=Phase', '13=Sine Out amplitude',
                       '14=DCLevel', '15I=nt.referenceFreq', '16=Ext.referenceFreq']
+    CAPTURE_CONFIGS = ['X', 'XY', 'RT', 'XYRT']
+    CAPTURE_TRANSFER_KB = 64  # maximum length of a single CAPTUREGET? transfer
     LIST_HORIZONTAL_TIME_DIV = ['0=0.5s', '1=1s', '2=2s', '3=5s', '4=10s', '5=30s', '6=1min',
                                 '7=2min', '8=5min', '9=10min', '10=30min', '11=1hour', '12=2hour',
                                 '13=6hour', '14=12hour', '15=1day', '16=2days']
@@ -124,7 +229,7 @@ class SR860(Instrument):
         "TBMODE?", "TBMODE %d",
         """Sets the external 10 MHZ timebase to auto(i=0) or internal(i=1).""",
         validator=strict_discrete_set,
-        values=[0, 1],
+        values=_indices([0, 1]),
         map_values=True
     )
     dcmode = Instrument.control(
@@ -132,7 +237,7 @@ class SR860(Instrument):
         """A string property that represents the sine out dc mode.
         This property can be set. Allowed values are:{}""".format(INPUT_DCMODE),
         validator=strict_discrete_set,
-        values=INPUT_DCMODE,
+        values=_indices(INPUT_DCMODE),
         map_values=True
     )
     reference_source = Instrument.control(
@@ -140,7 +245,7 @@ class SR860(Instrument):
         """A string property that represents the reference source.
         This property can be set. Allowed values are:{}""".format(INPUT_REFERENCESOURCE),
         validator=strict_discrete_set,
-        values=INPUT_REFERENCESOURCE,
+        values=_indices(INPUT_REFERENCESOURCE),
         map_values=True
     )
     reference_triggermode = Instrument.control(
@@ -148,7 +253,7 @@ class SR860(Instrument):
         """A string property that represents the external reference trigger mode.
         This property can be set. Allowed values are:{}""".format(INPUT_REFERENCETRIGGERMODE),
         validator=strict_discrete_set,
-        values=INPUT_REFERENCETRIGGERMODE,
+        values=_indices(INPUT_REFERENCETRIGGERMODE),
         map_values=True
     )
     reference_externalinput = Instrument.control(
@@ -156,7 +261,7 @@ class SR860(Instrument):
         """A string property that represents the external reference input.
         This property can be set. Allowed values are:{}""".format(INPUT_REFERENCEEXTERNALINPUT),
         validator=strict_discrete_set,
-        values=INPUT_REFERENCEEXTERNALINPUT,
+        values=_indices(INPUT_REFERENCEEXTERNALINPUT),
         map_values=True
     )
     input_signal = Instrument.control(
@@ -164,7 +269,7 @@ class SR860(Instrument):
         """A string property that represents the signal input.
         This property can be set. Allowed values are:{}""".format(INPUT_SIGNAL_INPUT),
         validator=strict_discrete_set,
-        values=INPUT_SIGNAL_INPUT,
+        values=_indices(INPUT_SIGNAL_INPUT),
         map_values=True
     )
     input_voltage_mode = Instrument.control(
@@ -172,7 +277,7 @@ class SR860(Instrument):
         """A string property that represents the voltage input mode.
         This property can be set. Allowed values are:{}""".format(INPUT_VOLTAGE_MODE),
         validator=strict_discrete_set,
-        values=INPUT_VOLTAGE_MODE,
+        values=_indices(INPUT_VOLTAGE_MODE),
         map_values=True
     )
     input_coupling = Instrument.control(
@@ -180,7 +285,7 @@ class SR860(Instrument):
         """A string property that represents the input coupling.
         This property can be set. Allowed values are:{}""".format(INPUT_COUPLING),
         validator=strict_discrete_set,
-        values=INPUT_COUPLING,
+        values=_indices(INPUT_COUPLING),
         map_values=True
     )
     input_shields = Instrument.control(
@@ -188,7 +293,7 @@ class SR860(Instrument):
         """A string property that represents the input shield grounding.
         This property can be set. Allowed values are:{}""".format(INPUT_SHIELDS),
         validator=strict_discrete_set,
-        values=INPUT_SHIELDS,
+        values=_indices(INPUT_SHIELDS),
         map_values=True
     )
     input_range = Instrument.control(
@@ -196,7 +301,7 @@ class SR860(Instrument):
         """A string property that represents the input range.
         This property can be set. Allowed values are:{}""".format(INPUT_RANGE),
         validator=strict_discrete_set,
-        values=INPUT_RANGE,
+        values=_indices(INPUT_RANGE),
         map_values=True
     )
     input_current_gain = Instrument.control(
@@ -204,7 +309,7 @@ class SR860(Instrument):
         """A string property that represents the current input gain.
         This property can be set. Allowed values are:{}""".format(INPUT_GAIN),
         validator=strict_discrete_set,
-        values=INPUT_GAIN,
+        values=_indices(INPUT_GAIN),
         map_values=True
     )
     sensitvity = Instrument.control(
@@ -212,7 +317,7 @@ class SR860(Instrument):
         """ A floating point property that controls the sensitivity in Volts,
         which can take discrete values from 2 nV to 1 V. Values are truncated
         to the next highest level if they are not exact. """,
-        validator=truncated_discrete_set,
+        validator=_truncated_sorted_set,
         values=SENSITIVITIES,
         map_values=True
     )
@@ -222,7 +327,7 @@ class SR860(Instrument):
         in seconds, which can take discrete values from 10 microseconds
         to 30,000 seconds. Values are truncated to the next highest
         level if they are not exact. """,
-        validator=truncated_discrete_set,
+        validator=_truncated_sorted_set,
         values=TIME_CONSTANTS,
         map_values=True
     )
@@ -238,7 +343,7 @@ class SR860(Instrument):
         """A string property that represents the synchronous filter.
         This property can be set. Allowed values are:{}""".format(INPUT_FILTER),
         validator=strict_discrete_set,
-        values=INPUT_FILTER,
+        values=_indices(INPUT_FILTER),
         map_values=True
     )
     filter_advanced = Instrument.control(
@@ -246,165 +351,62 @@ class SR860(Instrument):
         """A string property that represents the advanced filter.
         This property can be set. Allowed values are:{}""".format(INPUT_FILTER),
         validator=strict_discrete_set,
-        values=INPUT_FILTER,
+        values=_indices(INPUT_FILTER),
         map_values=True
     )
-    frequencypreset1 = Instrument.control(
-        "PSTF? 0", "PSTF 0, %0.6e",
-        """A floating point property that represents the preset frequency for the F1 preset button.
-        This property can be set.""",
-        validator=truncated_range,
-        values=[0.001, 500000]
-    )
-    frequencypreset2 = Instrument.control(
-        "PSTF? 1", "PSTF 1, %0.6e",
-        """A floating point property that represents the preset frequency for the F2 preset button.
-        This property can be set.""",
-        validator=truncated_range,
-        values=[0.001, 500000]
-    )
-    frequencypreset3 = Instrument.control(
-        "PSTF? 2", "PSTF2, %0.6e",
-        """A floating point property that represents the preset frequency for the F3 preset button.
-        This property can be set.""",
-        validator=truncated_range,
-        values=[0.001, 500000]
-    )
-    frequencypreset4 = Instrument.control(
-        "PSTF? 3", "PSTF3, %0.6e",
-        """A floating point property that represents the preset frequency for the F4 preset button.
-        This property can be set.""",
-        validator=truncated_range,
-        values=[0.001, 500000]
-    )
-    sine_amplitudepreset1 = Instrument.control(
-        "PSTA? 0", "PSTA0, %0.9e",
-        """Floating point property representing the preset sine out amplitude, for the A1 preset button.
-        This property can be set.""",
-        validator=truncated_range,
-        values=[1e-9, 2]
-    )
-    sine_amplitudepreset2 = Instrument.control(
-        "PSTA? 1", "PSTA1, %0.9e",
-        """Floating point property representing the preset sine out amplitude, for the A2 preset button.
-        This property can be set.""",
-        validator=truncated_range,
-        values=[1e-9, 2]
-    )
-    sine_amplitudepreset3 = Instrument.control(
-        "PSTA? 2", "PSTA2, %0.9e",
-        """Floating point property representing the preset sine out amplitude, for the A3 preset button.
-        This property can be set.""",
-        validator=truncated_range,
-        values=[1e-9, 2]
-    )
-    sine_amplitudepreset4 = Instrument.control(
-        "PSTA? 3", "PSTA 3, %0.9e",
-        """Floating point property representing the preset sine out amplitude, for the A3 preset button.
-        This property can be set.""",
-        validator=truncated_range,
-        values=[1e-9, 2]
-    )
-    sine_dclevelpreset1 = Instrument.control(
-        "PSTL? 0", "PSTL 0, %0.3e",
-        """A floating point property that represents the preset sine out dc level for the L1 button.
-        This property can be set.""",
-        validator=truncated_range,
-        values=[-5, 5]
-    )
-    sine_dclevelpreset2 = Instrument.control(
-        "PSTL? 1", "PSTL 1, %0.3e",
-        """A floating point property that represents the preset sine out dc level for the L2 button.
-        This property can be set.""",
-        validator=truncated_range,
-        values=[-5, 5]
-    )
-    sine_dclevelpreset3 = Instrument.control(
-        "PSTL? 2", "PSTL 2, %0.3e",
-        """A floating point property that represents the preset sine out dc level for the L3 button.
-        This property can be set.""",
-        validator=truncated_range,
-        values=[-5, 5]
-    )
-    sine_dclevelpreset4 = Instrument.control(
-        "PSTL? 3", "PSTL3, %0.3e",
-        """A floating point property that represents the preset sine out dc level for the L4 button.
-        This property can be set.""",
-        validator=truncated_range,
-        values=[-5, 5]
-    )
-
-    aux_out_1 = Instrument.control(
-        "AUXV? 0", "AUXV 1, %f",
-        """ A floating point property that controls the output of Aux output 1 in
-        Volts, taking values between -10.5 V and +10.5 V.
-        This property can be set.""",
-        validator=truncated_range,
-        values=[-10.5, 10.5]
-    )
-    # For consistency with other lock-in instrument classes
-    dac1 = aux_out_1
-
-    aux_out_2 = Instrument.control(
-        "AUXV? 1", "AUXV 2, %f",
-        """ A floating point property that controls the output of Aux output 2 in
-        Volts, taking values between -10.5 V and +10.5 V.
-        This property can be set.""",
-        validator=truncated_range,
-        values=[-10.5, 10.5]
-    )
-    # For consistency with other lock-in instrument classes
-    dac2 = aux_out_2
-
-    aux_out_3 = Instrument.control(
-        "AUXV? 2", "AUXV 3, %f",
-        """ A floating point property that controls the output of Aux output 3 in
-        Volts, taking values between -10.5 V and +10.5 V.
-        This property can be set.""",
-        validator=truncated_range,
-        values=[-10.5, 10.5]
-    )
-    # For consistency with other lock-in instrument classes
-    dac3 = aux_out_3
-
-    aux_out_4 = Instrument.control(
-        "AUXV? 3", "AUXV 4, %f",
-        """ A floating point property that controls the output of Aux output 4 in
-        Volts, taking values between -10.5 V and +10.5 V.
-        This property can be set.""",
-        validator=truncated_range,
-        values=[-10.5, 10.5]
-    )
-    # For consistency with other lock-in instrument classes
-    dac4 = aux_out_4
+    frequencypreset1, frequencypreset2, frequencypreset3, frequencypreset4 = [
+        Instrument.control(
+            "PSTF? %d" % i, "PSTF %d, %%0.6e" % i,
+            """A floating point property that represents the preset frequency for the F%d
+            preset button. This property can be set.""" % (i + 1),
+            validator=truncated_range,
+            values=[0.001, 500000]
+        ) for i in range(4)]
+    sine_amplitudepreset1, sine_amplitudepreset2, sine_amplitudepreset3, sine_amplitudepreset4 = [
+        Instrument.control(
+            "PSTA? %d" % i, "PSTA %d, %%0.9e" % i,
+            """Floating point property representing the preset sine out amplitude, for the A%d
+            preset button. This property can be set.""" % (i + 1),
+            validator=truncated_range,
+            values=[1e-9, 2]
+        ) for i in range(4)]
+    sine_dclevelpreset1, sine_dclevelpreset2, sine_dclevelpreset3, sine_dclevelpreset4 = [
+        Instrument.control(
+            "PSTL? %d" % i, "PSTL %d, %%0.3e" % i,
+            """A floating point property that represents the preset sine out dc level for the L%d
+            button. This property can be set.""" % (i + 1),
+            validator=truncated_range,
+            values=[-5, 5]
+        ) for i in range(4)]
 
-    aux_in_1 = Instrument.measurement(
-        "OAUX? 0",
-        """ Reads the Aux input 1 value in Volts with 1/3 mV resolution. """
-    )
+    aux_out_1, aux_out_2, aux_out_3, aux_out_4 = [
+        Instrument.control(
+            "AUXV? %d" % i, "AUXV %d, %%f" % i,
+            """ A floating point property that controls the output of Aux output %d in
+            Volts, taking values between -10.5 V and +10.5 V.
+            This property can be set.""" % (i + 1),
+            validator=truncated_range,
+            values=[-10.5, 10.5]
+        ) for i in range(4)]
     # For consistency with other lock-in instrument classes
-    adc1 = aux_in_1
+    dac1, dac2, dac3, dac4 = aux_out_1, aux_out_2, aux_out_3, aux_out_4
 
-    aux_in_2 = Instrument.measurement(
-        "OAUX? 1",
-        """ Reads the Aux input 2 value in Volts with 1/3 mV resolution. """
-    )
+    aux_in_1, aux_in_2, aux_in_3, aux_in_4 = [
+        Instrument.measurement(
+            "OAUX? %d" % i,
+            """ Reads the Aux input %d value in Volts with 1/3 mV resolution. """ % (i + 1)
+        ) for i in range(4)]
     # For consistency with other lock-in instrument classes
-    adc2 = aux_in_2
+    adc1, adc2, adc3, adc4 = aux_in_1, aux_in_2, aux_in_3, aux_in_4
 
-    aux_in_3 = Instrument.measurement(
-        "OAUX? 2",
-        """ Reads the Aux input 3 value in Volts with 1/3 mV resolution. """
-    )
-    # For consistency with other lock-in instrument classes
-    adc3 = aux_in_3
+    def get_aux_inputs(self):
+        """Reads the four Aux input values in Volts in two queries instead of
+        four: inputs 1 to 3 are recorded at a single instant with SNAP?, and
+        input 4 is read separately.
 
-    aux_in_4 = Instrument.measurement(
-        "OAUX? 3",
-        """ Reads the Aux input 4 value in Volts with 1/3 mV resolution. """
-    )
-    # For consistency with other lock-in instrument classes
-    adc4 = aux_in_4
+        :return: list of the four Aux input values
+        """
+        return self.snap("IN1", "IN2", "IN3") + [self.aux_in_4]
 
     def snap(self, val1="X", val2="Y", val3=None):
         """retrieve 2 or 3 parameters at once
@@ -444,6 +446,24 @@ class SR860(Instrument):
                 cast=float,
             )
 
+    def snap_data_channels(self):
+        """Retrieve the values of the four data channels DAT1 to DAT4 at once.
+
+        The parameters shown by the data channels are assigned with
+        :attr:`parameter_DAT1` to :attr:`parameter_DAT4`, so that up to four
+        arbitrary parameters (see :meth:`snap` for their enumeration) are
+        recorded at a single instant and read in one query, e.g. together with
+        :meth:`snap` X, Y, R, θ and the four Aux inputs take two queries
+        instead of eight.
+
+        :return: list of the four data channel values
+        """
+        return self.adapter.values(
+            command="SNAPD?",
+            separator=",",
+            cast=float,
+        )
+
     gettimebase = Instrument.measurement(
         "TBSTAT?",
         """Returns the current 10 MHz timebase source."""
@@ -469,7 +489,7 @@ class SR860(Instrument):
         "DBLK?", "DBLK %i",
         """Turns the front panel blanking on(i=0) or off(i=1).""",
         validator=strict_discrete_set,
-        values=ON_OFF_VALUES,
+        values=_indices(ON_OFF_VALUES),
         map_values=True
     )
     screen_layout = Instrument.control(
@@ -478,7 +498,7 @@ class SR860(Instrument):
         history(i=1), half strip chart history(i=2), full FFT(i=3), half FFT(i=4) or big
         numerical(i=5).""",
         validator=strict_discrete_set,
-        values=SCREEN_LAYOUT_VALUES,
+        values=_indices(SCREEN_LAYOUT_VALUES),
         map_values=True
     )
 
@@ -490,66 +510,10 @@ class SR860(Instrument):
         """
         self.write("DCAP")
 
-    parameter_DAT1 = Instrument.control(
-        "CDSP? 0", "CDSP 0, %i",
-        """A integer property that assigns a parameter to data channel 1(green).
-        This parameters can be set. Allowed values are:{}""".format(LIST_PARAMETER),
-        validator=strict_discrete_set,
-        values=range(0, 16)
-    )
-    parameter_DAT2 = Instrument.control(
-        "CDSP? 1", "CDSP 1, %i",
-        """A integer property that assigns a parameter to data channel 2(blue).
-        This parameters can be set. Allowed values are:{}""".format(LIST_PARAMETER),
-        validator=strict_discrete_set,
-        values=range(0, 16)
-    )
-    parameter_DAT3 = Instrument.control(
-        "CDSP? 2", "CDSP 2, %i",
-        """A integer property that assigns a parameter to data channel 3(yellow).
-        This parameters can be set. Allowed values are:{}""".format(LIST_PARAMETER),
-        validator=strict_discrete_set,
-        values=range(0, 16)
-    )
-    parameter_DAT4 = Instrument.control(
-        "CDSP? 3", "CDSP 3, %i",
-        """A integer property that assigns a parameter to data channel 3(orange).
-        This parameters can be set. Allowed values are:{}""".format(LIST_PARAMETER),
-        validator=strict_discrete_set,
-        values=range(0, 16)
-    )
-    strip_chart_dat1 = Instrument.control(
-        "CGRF? 0", "CGRF 0, %i",
-        """A integer property that turns the strip chart graph of data channel 1 off(i=0) or on(i=1).
-        """,
-        validator=strict_discrete_set,
-        values=ON_OFF_VALUES,
-        map_values=True
-    )
-    strip_chart_dat2 = Instrument.control(
-        "CGRF? 1", "CGRF 1, %i",
-        """A integer property that turns the strip chart graph of data channel 2 off(i=0) or on(i=1).
-        """,
-        validator=strict_discrete_set,
-        values=ON_OFF_VALUES,
-        map_values=True
-    )
-    strip_chart_dat3 = Instrument.control(
-        "CGRF? 2", "CGRF 2, %i",
-        """A integer property that turns the strip chart graph of data channel 1 off(i=0) or on(i=1).
-        """,
-        validator=strict_discrete_set,
-        values=ON_OFF_VALUES,
-        map_values=True
-    )
-    strip_chart_dat4 = Instrument.control(
-        "CGRF? 3", "CGRF 3, %i",
-        """A integer property that turns the strip chart graph of data channel 4 off(i=0) or on(i=1).
-        """,
-        validator=strict_discrete_set,
-        values=ON_OFF_VALUES,
-        map_values=True
-    )
+    parameter_DAT1, parameter_DAT2, parameter_DAT3, parameter_DAT4 = \
+        _data_channel_parameters(LIST_PARAMETER)
+    strip_chart_dat1, strip_chart_dat2, strip_chart_dat3, strip_chart_dat4 = \
+        _strip_chart_controls(ON_OFF_VALUES)
     # Strip Chart commands
     horizontal_time_div = Instrument.control(
         "GSPD?", "GSDP %i",
@@ -558,10 +522,213 @@ class SR860(Instrument):
         validator=strict_discrete_set,
         values=range(0, 16)
     )
+    # Data capture commands
+    capture_length = Instrument.control(
+        "CAPTURELEN?", "CAPTURELEN %d",
+        """An integer property that sets the length of the capture buffer in
+        kilobytes, from 1 to 4096 kB. This property can be set.""",
+        validator=strict_range,
+        values=[1, 4096]
+    )
+    capture_config = Instrument.control(
+        "CAPTURECFG?", "CAPTURECFG %d",
+        """A string property that selects the parameters recorded by the capture
+        buffer. This property can be set. Allowed values are:{}""".format(CAPTURE_CONFIGS),
+        validator=strict_discrete_set,
+        values=_indices(CAPTURE_CONFIGS),
+        map_values=True
+    )
+    capture_bytes = Instrument.measurement(
+        "CAPTUREBYTES?",
+        """Returns the number of bytes captured so far."""
+    )
 
-    def __init__(self, resourceName, **kwargs):
+    def start_capture(self, continuous=False, trigger="IMM"):
+        """Start filling the capture buffer.
+
+        :param continuous: fill the buffer continuously (wrapping around)
+            instead of stopping once it is full
+        :param trigger: start immediately ("IMM"), on a hardware trigger
+            ("TRIG"), or record one sample per trigger ("SAMP")
+        """
+        self.write("CAPTURESTART %s, %s" % ("CONT" if continuous else "ONE", trigger))
+
+    def stop_capture(self):
+        """Stop filling the capture buffer."""
+        self.write("CAPTURESTOP")
+
+    def get_capture_buffer(self, length_kb=None, offset_kb=0):
+        """Acquire the 32 bit floating point data of the capture buffer through
+        binary transfer. The data is read in IEEE 488.2 binary blocks of at most
+        64 kB and parsed directly into a numpy array, which holds the recorded
+        parameters (see :attr:`capture_config`) interleaved.
+
+        :param length_kb: number of kilobytes to read, defaults to the whole
+            kilobytes captured so far after `offset_kb`; a trailing partial
+            kilobyte is not read
+        :param offset_kb: offset in kilobytes from the start of the buffer
+        :return: numpy array of 32 bit floats
+        """
+        if length_kb is None:
+            length_kb = max(int(self.capture_bytes) // 1024 - offset_kb, 0)
+        blocks = []
+        for offset in range(offset_kb, offset_kb + length_kb, self.CAPTURE_TRANSFER_KB):
+            length = min(self.CAPTURE_TRANSFER_KB, offset_kb + length_kb - offset)
+            blocks.append(self.adapter.connection.query_binary_values(
+                "CAPTUREGET? %d, %d" % (offset, length),
+                datatype='f',
+                is_big_endian=False,
+                container=np.ndarray,
+                chunk_size=(self.CAPTURE_TRANSFER_KB + 1) * 1024,
+            ))
+        if not blocks:
+            return np.empty(0, dtype=np.float32)
+        return np.concatenate(blocks)
+
+    # Remember the settings that sweeps commonly re-assert between points,
+    # so that setting an unchanged value does not cost a write
+    sensitvity = _remember_setting(sensitvity, 'sensitvity')
+    time_constant = _remember_setting(time_constant, 'time_constant')
+    input_range = _remember_setting(input_range, 'input_range')
+    filter_slope = _remember_setting(filter_slope, 'filter_slope')
+    # The frequency presets only change when set, so they are read from the
+    # instrument once
+    frequencypreset1 = _remember_setting(
+        frequencypreset1, 'frequencypreset1', cached_read=True,
+        written=_written_value("%0.6e", [0.001, 500000]))
+    frequencypreset2 = _remember_setting(
+        frequencypreset2, 'frequencypreset2', cached_read=True,
+        written=_written_value("%0.6e", [0.001, 500000]))
+    frequencypreset3 = _remember_setting(
+        frequencypreset3, 'frequencypreset3', cached_read=True,
+        written=_written_value("%0.6e", [0.001, 500000]))
+    frequencypreset4 = _remember_setting(
+        frequencypreset4, 'frequencypreset4', cached_read=True,
+        written=_written_value("%0.6e", [0.001, 500000]))
+    # Setpoints which are nudged in fine sweeps are compared as they are
+    # written, so that a step below the resolution of the command is skipped
+    phase = _remember_setting(
+        phase, 'phase', written=_written_value("%0.7f", [-360, 360]))
+    frequency = _remember_setting(
+        frequency, 'frequency', invalidates=('internalfrequency',),
+        written=_written_value("%0.6e", [0.001, 500000]))
+    internalfrequency = _remember_setting(
+        internalfrequency, 'internalfrequency', invalidates=('frequency',),
+        written=_written_value("%0.6e", [0.001, 500000]))
+    sine_voltage = _remember_setting(
+        sine_voltage, 'sine_voltage', written=_written_value("%0.9e", [1e-9, 2]))
+    # The reference frequency follows the external reference
+    reference_source = _remember_setting(
+        reference_source, 'reference_source', invalidates=('frequency',))
+
+    def __init__(self, resourceName, chunk_size=(CAPTURE_TRANSFER_KB + 1) * 1024, **kwargs):
+        """
+        :param chunk_size: size in bytes of the low-level reads of the VISA
+            connection, by default large enough to read a full capture buffer
+            transfer (see :meth:`get_capture_buffer`) in one read instead of
+            several reads of pyvisa's default 20 kB. Each read allocates a buffer
+            of this size, so larger values cost memory on short queries.
+        """
         super(SR860, self).__init__(
             resourceName,
             "Stanford Research Systems SR860 Lock-in amplifier",
+            chunk_size=chunk_size,
             **kwargs
         )
+        self._settings = {}
+        self._executor = None
+
+    def configure_async(self, config):
+        """Sets several properties in a background thread and returns at once,
+        so that several instruments are configured concurrently, e.g.::
+
+            futures = [lockin.configure_async({"sensitvity": 1e-3, "time_constant": 0.1})
+                       for lockin in lockins]
+            concurrent.futures.wait(futures)
+
+        The properties are set in the order of `config`, and successive calls
+        are run one after the other, as the connection to the instrument must
+        only be used from one thread at a time. For the same reason, do not
+        access the instrument otherwise until the returned future is done.
+
+        :param config: dict of property names and the values to set them to
+        :return: :class:`concurrent.futures.Future`, which is done once all
+            properties are set and holds any error raised while setting them
+        """
+        self._check_properties(config)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        return self._executor.submit(self._configure, dict(config))
+
+    def _configure(self, config):
+        for name, value in config.items():
+            setattr(self, name, value)
+
+    def _check_properties(self, names):
+        for name in names:
+            if not isinstance(getattr(type(self), name, None), property):
+                raise ValueError("SR860 has no property named %r" % name)
+
+    def apply(self, **kwargs):
+        """Sets several properties with a single compound command, which ends
+        with ``*OPC?`` and returns once the instrument has processed all of them,
+        e.g. ``apply(time_constant=0.1, filter_slope=2, sensitvity=1e-3)``.
+        Compared to setting the properties one by one, this saves a bus
+        transaction per property.
+
+        :param kwargs: property names and the values to set them to
+        """
+        self._check_properties(kwargs)
+        try:
+            commands = self._setter_commands(kwargs)
+            if commands:
+                self.ask(";".join(commands + ["*OPC?"]))
+        except Exception:
+            # the remembered values may not have reached the instrument
+            self.invalidate_cache()
+            raise
+
+    def _setter_commands(self, config):
+        """ Returns the commands written by setting the properties in `config`,
+        which are run on a stand-in, so that the instrument's own writes are
+        not affected
+        """
+        recorder = _CommandRecorder(self._settings)
+        for name, value in config.items():
+            prop = getattr(type(self), name)
+            if prop.fset is None:
+                raise AttributeError("SR860 property %r can not be set" % name)
+            prop.fset(recorder, value)
+        return recorder.commands
+
+    def write_compound(self, *commands):
+        """Writes several commands to the instrument in a single transaction,
+        joined with semicolons, e.g. ``write_compound("OFLT 9", "OFSL 3")``.
+
+        :param commands: command strings to be sent to the instrument
+        """
+        self.write(";".join(commands))
+
+    def invalidate_cache(self):
+        """Forget the remembered values of :attr:`sensitvity`, :attr:`time_constant`,
+        :attr:`input_range`, :attr:`filter_slope`, the frequency presets, :attr:`phase`,
+        :attr:`frequency`, :attr:`internalfrequency`, :attr:`sine_voltage` and
+        :attr:`reference_source`. Setting these properties skips the write when the
+        value equals the last one set or read (for the setpoints, when it is written
+        as the same command), and the frequency presets are only queried once, so
+        call this method after changing them by other means, e.g. on the front panel.
+        """
+        self._settings.clear()
+
+    def reset(self):
+        """ Resets the instrument. """
+        super().reset()
+        self.invalidate_cache()
+
+    def shutdown(self):
+        """ Waits for pending :meth:`configure_async` calls and releases
+        their worker thread, then shuts down the instrument. """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        super().shutdown()
@@ -22,9 +22,20 @@
 # THE SOFTWARE.
 #
 
+import os
+import tempfile
+from importlib.machinery import SourceFileLoader
+from queue import SimpleQueue
+
+from pymeasure.experiment.listeners import Recorder
+from pymeasure.experiment.results import Results
+
+# Load the procedure, without it being in a module
+data_path = os.path.join(os.path.dirname(__file__), 'data/procedure_for_testing.py')
+RandomProcedure = SourceFileLoader('procedure', data_path).load_module().RandomProcedure
+
 # import time
 # from queue import Queue
-
 # from pymeasure.experiment.listeners import Listener, Recorder
 # from pymeasure.experiment.results import Results
 
@@ -38,3 +49,17 @@ def test_recorder_stop():
     r = Recorder(d, q)
     r.
 """
+
+
+def test_recorder_writes_formatted_record_to_all_files():
+    procedure = RandomProcedure()
+    files = [tempfile.mktemp(), tempfile.mktemp()]
+    results = Results(procedure, files)
+    recorder = Recorder(results, SimpleQueue())
+    recorder.start()
+    recorder.handle({'Iteration': 1, 'Random Number': 0.5})
+    recorder.stop()
+
+    for file in files:
+        with open(file) as f:
+            assert f.read().splitlines()[-1] == '1,0.5'
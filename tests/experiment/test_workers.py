@@ -26,8 +26,10 @@ import logging
 
 import pytest
 import os
+import subprocess
+import sys
 import tempfile
-from time import sleep
+from time import monotonic, sleep
 from importlib.machinery import SourceFileLoader
 
 from pymeasure.experiment import Listener, Procedure
@@ -143,3 +145,176 @@ def test_zmq_topic_filtering_works(caplog):
     assert procedure.status == procedure.FINISHED
     assert len(received) == 3
     assert all([item[0] == 'results' for item in received])
+
+
+@pytest.mark.skipif(not tcp_libs_available,
+                    reason='TCP communication packages not installed')
+def test_worker_dumps_falls_back_to_cloudpickle():
+    import pickle
+    import cloudpickle
+
+    worker = Worker(Results(RandomProcedure(), tempfile.mktemp()))
+    record = {'Iteration': 1, 'Random Number': 0.5}
+    assert pickle.loads(worker._dumps(record)) == record
+
+    def scale(x):
+        return 2 * x
+
+    def shift(x):
+        return x + 1
+    assert cloudpickle.loads(worker._dumps(scale))(2) == 4
+    assert cloudpickle.loads(worker._dumps(shift))(2) == 3
+
+
+@pytest.mark.skipif(not tcp_libs_available,
+                    reason='TCP communication packages not installed')
+def test_zmq_batched_results_are_received_individually():
+
+    class ManyResultsProcedure(Procedure):
+        def execute(self):
+            for i in range(100):
+                self.emit('results', i)
+
+    procedure = ManyResultsProcedure()
+    file = tempfile.mktemp()
+    results = Results(procedure, file)
+    received = []
+    worker = Worker(results, port=5889, log_level=logging.DEBUG)
+    listener = Listener(port=5889, topic='results', timeout=0.1)
+    sleep(0.5)  # leave time for subscriber and publisher to establish a connection
+    worker.start()
+    while True:
+        if not listener.message_waiting():
+            break
+        received.append(listener.receive())
+    worker.join(timeout=4.0)
+    assert procedure.status == procedure.FINISHED
+    assert [record for _, record in received] == list(range(100))
+
+
+@pytest.mark.skipif(not tcp_libs_available,
+                    reason='TCP communication packages not installed')
+def test_zmq_lone_result_is_sent_after_batch_window():
+    emitted = []
+
+    class SlowPointProcedure(Procedure):
+        def execute(self):
+            emitted.append(monotonic())
+            self.emit('results', 1)
+            sleep(2)
+
+    procedure = SlowPointProcedure()
+    file = tempfile.mktemp()
+    results = Results(procedure, file)
+    worker = Worker(results, port=5897, log_level=logging.DEBUG)
+    listener = Listener(port=5897, topic='results', timeout=3)
+    sleep(0.5)  # leave time for subscriber and publisher to establish a connection
+    worker.start()
+    assert listener.message_waiting()
+    assert listener.receive() == ('results', 1)
+    assert monotonic() - emitted[0] < Worker.EMIT_BATCH_WINDOW + 0.5
+    worker.join(timeout=4.0)
+    assert procedure.status == procedure.FINISHED
+
+
+@pytest.mark.skipif(not tcp_libs_available,
+                    reason='TCP communication packages not installed')
+def test_zmq_numeric_and_other_results_round_trip():
+
+    class MixedResultsProcedure(Procedure):
+        DATA_COLUMNS = ['Iteration', 'Value']
+
+        def execute(self):
+            self.emit('results', {'Iteration': 0, 'Value': 0.5})
+            self.emit('results', {'Iteration': 1, 'Value': 1.5})
+            self.emit('results', {'Iteration': 2, 'Value': 'text'})
+            self.emit('results', {'Iteration': 3, 'Value': 3})
+            self.emit('results', {'Iteration': 2 ** 70, 'Value': 4.5})
+
+    procedure = MixedResultsProcedure()
+    file = tempfile.mktemp()
+    results = Results(procedure, file)
+    received = []
+    worker = Worker(results, port=5890, log_level=logging.DEBUG)
+    listener = Listener(port=5890, topic='results', timeout=0.1)
+    sleep(0.5)  # leave time for subscriber and publisher to establish a connection
+    worker.start()
+    while True:
+        if not listener.message_waiting():
+            break
+        received.append(listener.receive()[1])
+    worker.join(timeout=4.0)
+    assert procedure.status == procedure.FINISHED
+    assert received == [
+        {'Iteration': 0, 'Value': 0.5},
+        {'Iteration': 1, 'Value': 1.5},
+        {'Iteration': 2, 'Value': 'text'},
+        {'Iteration': 3, 'Value': 3},
+        {'Iteration': 2 ** 70, 'Value': 4.5},
+    ]
+    assert [type(record['Value']) for record in received] == [float, float, str, int, float]
+
+
+@pytest.mark.skipif(not tcp_libs_available,
+                    reason='TCP communication packages not installed')
+def test_zmq_messages_are_sent_as_topic_and_payload_frames():
+    import zmq
+
+    class StatusOnlyProcedure(Procedure):
+        def execute(self):
+            pass
+
+    procedure = StatusOnlyProcedure()
+    file = tempfile.mktemp()
+    results = Results(procedure, file)
+    worker = Worker(results, port=5891, log_level=logging.DEBUG)
+    context = zmq.Context()
+    subscriber = context.socket(zmq.SUB)
+    subscriber.setsockopt(zmq.SUBSCRIBE, b'status')
+    subscriber.connect('tcp://localhost:5891')
+    sleep(0.5)  # leave time for subscriber and publisher to establish a connection
+    worker.start()
+    assert subscriber.poll(2000)
+    frames = subscriber.recv_multipart()
+    worker.join(timeout=4.0)
+    subscriber.close()
+    context.term()
+    assert len(frames) == 2
+    assert frames[0] == b'status'
+
+
+def test_worker_monitor_queue_receives_str_topics():
+    procedure = RandomProcedure()
+    procedure.iterations = 10
+    procedure.delay = 0.001
+    file = tempfile.mktemp()
+    results = Results(procedure, file)
+    worker = Worker(results)
+    worker.start()
+    worker.join(timeout=5)
+
+    messages = []
+    while True:
+        message = worker.monitor_queue.get(timeout=1)
+        if message is None:
+            break
+        messages.append(message)
+    assert messages[0] == ('status', Procedure.RUNNING)
+    assert messages[-1] == ('progress', 100.)
+    assert all(topic in ('status', 'progress') for topic, _ in messages)
+
+
+@pytest.mark.skipif(not tcp_libs_available,
+                    reason='TCP communication packages not installed')
+def test_interpreter_exits_with_unstarted_zmq_worker():
+    script = "\n".join([
+        "import tempfile",
+        "from importlib.machinery import SourceFileLoader",
+        "from pymeasure.experiment.workers import Worker",
+        "from pymeasure.experiment.results import Results",
+        "RandomProcedure = SourceFileLoader('procedure', %r).load_module().RandomProcedure"
+        % data_path,
+        "Worker(Results(RandomProcedure(), tempfile.mktemp()), port=5896)",
+    ])
+    completed = subprocess.run([sys.executable, "-c", script], timeout=20)
+    assert completed.returncode == 0
@@ -0,0 +1,219 @@
+#
+# This file is part of the PyMeasure package.
+#
+# Copyright (c) 2013-2021 PyMeasure Developers
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from pymeasure.adapters import FakeAdapter
+from pymeasure.instruments.srs.sr860 import SR860
+from pymeasure.instruments.validators import truncated_discrete_set
+
+
+def test_snap_data_channels():
+    adapter = FakeAdapter()
+    sr860 = SR860(adapter)
+    assert sr860.snap_data_channels() == ["SNAPD?"]
+
+
+def test_remembered_setting_skips_unchanged_write():
+    adapter = FakeAdapter()
+    sr860 = SR860(adapter)
+    sr860.time_constant = 1
+    assert adapter.read() == "OFLT 12"
+    sr860.time_constant = 1
+    assert adapter.read() == ""
+    sr860.time_constant = 3
+    assert adapter.read() == "OFLT 13"
+    sr860.invalidate_cache()
+    sr860.time_constant = 3
+    assert adapter.read() == "OFLT 13"
+
+
+def test_get_capture_buffer_in_blocks():
+    adapter = FakeAdapter()
+    adapter.connection = mock.Mock()
+    adapter.connection.query_binary_values.side_effect = lambda command, **kwargs: np.ones(
+        int(command.split(",")[1]) * 256, dtype=np.float32)
+    sr860 = SR860(adapter)
+    data = sr860.get_capture_buffer(130)
+    commands = [call[0][0] for call in adapter.connection.query_binary_values.call_args_list]
+    assert commands == ["CAPTUREGET? 0, 64", "CAPTUREGET? 64, 64", "CAPTUREGET? 128, 2"]
+    assert data.shape == (130 * 256,)
+
+
+def test_get_aux_inputs():
+    adapter = FakeAdapter()
+    sr860 = SR860(adapter)
+    assert sr860.get_aux_inputs() == ["SNAP? IN1", " IN2", " IN3", "OAUX? 3"]
+
+
+def test_write_compound():
+    adapter = FakeAdapter()
+    sr860 = SR860(adapter)
+    sr860.write_compound("OFLT 9", "OFSL 3", "SCAL 5")
+    assert adapter.read() == "OFLT 9;OFSL 3;SCAL 5"
+
+
+def test_mapped_control_uses_index():
+    adapter = FakeAdapter()
+    sr860 = SR860(adapter)
+    sr860.input_coupling = "DC"
+    assert adapter.read() == "ICPL 1"
+    with pytest.raises(ValueError):
+        sr860.input_coupling = "GND"
+
+
+def test_frequency_presets_are_read_once():
+    adapter = FakeAdapter()
+    sr860 = SR860(adapter)
+    assert sr860.frequencypreset1 == "PSTF? 0"
+    adapter.write("unread")
+    assert sr860.frequencypreset1 == "PSTF? 0"
+    assert adapter.read() == "unread"
+    sr860.frequencypreset1 = 1234.56789123
+    assert adapter.read() == "PSTF 0, 1.234568e+03"
+    assert sr860.frequencypreset1 == 1234.568
+    sr860.frequencypreset1 = 1e9
+    assert adapter.read() == "PSTF 0, 5.000000e+05"
+    assert sr860.frequencypreset1 == 500000
+    assert adapter.read() == ""
+    sr860.invalidate_cache()
+    assert sr860.frequencypreset1 == "PSTF? 0"
+
+
+def test_timebase_status_is_not_cached():
+    adapter = FakeAdapter()
+    sr860 = SR860(adapter)
+    assert sr860.gettimebase == "TBSTAT?"
+    adapter.write("1")
+    assert sr860.gettimebase == "1TBSTAT?"
+
+
+@pytest.mark.parametrize("value", [0, 1e-9, 1.5e-9, 3e-3, 0.5, 1, 2])
+def test_sensitivity_truncation_matches_truncated_discrete_set(value):
+    adapter = FakeAdapter()
+    sr860 = SR860(adapter)
+    sr860.sensitvity = value
+    expected = SR860.SENSITIVITIES.index(truncated_discrete_set(value, SR860.SENSITIVITIES))
+    assert adapter.read() == "SCAL %d" % expected
+
+
+def test_configure_async():
+    adapter = FakeAdapter()
+    sr860 = SR860(adapter)
+    future = sr860.configure_async({"time_constant": 1, "filter_slope": 2})
+    future.result(timeout=5)
+    assert adapter.read() == "OFLT 12OFSL 2"
+    with pytest.raises(ValueError):
+        sr860.configure_async({"time_constent": 1})
+    future = sr860.configure_async({"filter_slope": 5})
+    with pytest.raises(ValueError):
+        future.result(timeout=5)
+    sr860.shutdown()
+    assert sr860._executor is None
+    assert sr860.isShutdown
+
+
+@pytest.mark.parametrize("i", range(1, 5))
+def test_indexed_controls(i):
+    adapter = FakeAdapter()
+    sr860 = SR860(adapter)
+    setattr(sr860, "aux_out_%d" % i, 1.5)
+    assert adapter.read() == "AUXV %d, 1.500000" % (i - 1)
+    setattr(sr860, "sine_dclevelpreset%d" % i, 1)
+    assert adapter.read() == "PSTL %d, 1.000e+00" % (i - 1)
+    assert getattr(SR860, "dac%d" % i) is getattr(SR860, "aux_out_%d" % i)
+    assert getattr(sr860, "adc%d" % i) == "OAUX? %d" % (i - 1)
+
+
+def test_frequency_write_skipped_below_resolution():
+    adapter = FakeAdapter()
+    sr860 = SR860(adapter)
+    sr860.frequency = 1000
+    assert adapter.read() == "FREQ 1.000000e+03"
+    sr860.frequency = 1000.0001
+    assert adapter.read() == ""
+    sr860.frequency = 1000.01
+    assert adapter.read() == "FREQ 1.000010e+03"
+    sr860.internalfrequency = 2000
+    assert adapter.read() == "FREQINT 2.000000e+03"
+    sr860.frequency = 1000.01
+    assert adapter.read() == "FREQ 1.000010e+03"
+
+
+def test_apply():
+    adapter = FakeAdapter()
+    sr860 = SR860(adapter)
+    with mock.patch.object(sr860, "ask") as ask:
+        sr860.apply(time_constant=1, filter_slope=2, input_coupling="DC")
+    ask.assert_called_once_with("OFLT 12;OFSL 2;ICPL 1;*OPC?")
+    assert adapter.read() == ""
+    sr860.time_constant = 1
+    assert adapter.read() == ""
+    with pytest.raises(ValueError):
+        sr860.apply(time_constant=3, filter_slope=5)
+    sr860.time_constant = 1
+    assert adapter.read() == "OFLT 12"
+
+
+def test_chunk_size_passed_to_visa_adapter():
+    with mock.patch("pymeasure.instruments.instrument.VISAAdapter") as adapter:
+        SR860("TCPIP::127.0.0.1::INSTR")
+        SR860("TCPIP::127.0.0.1::INSTR", chunk_size=1024)
+    assert [call[1]["chunk_size"] for call in adapter.call_args_list] == [65 * 1024, 1024]
+
+
+@pytest.mark.parametrize("offset_kb, commands", [
+    (0, ["CAPTUREGET? 0, 64", "CAPTUREGET? 64, 6"]),
+    (10, ["CAPTUREGET? 10, 60"]),
+    (80, []),
+])
+def test_get_capture_buffer_reads_captured_data_after_offset(offset_kb, commands):
+    adapter = FakeAdapter()
+    adapter.connection = mock.Mock()
+    adapter.connection.query_binary_values.return_value = np.ones(1, dtype=np.float32)
+    sr860 = SR860(adapter)
+    with mock.patch.object(SR860, "capture_bytes", 70 * 1024 + 512):
+        sr860.get_capture_buffer(offset_kb=offset_kb)
+    assert [call[0][0] for call in
+            adapter.connection.query_binary_values.call_args_list] == commands
+
+
+def test_apply_does_not_capture_concurrent_writes():
+    adapter = FakeAdapter()
+    sr860 = SR860(adapter)
+
+    def write_during_apply(value):
+        sr860.write("OFLT 12")  # e.g. from a configure_async thread
+        return value
+
+    with mock.patch.object(SR860, "filter_slope", SR860.control(
+            "OFSL?", "OFSL %d", "", set_process=write_during_apply)):
+        with mock.patch.object(sr860, "ask") as ask:
+            sr860.apply(filter_slope=2)
+    ask.assert_called_once_with("OFSL 2;*OPC?")
+    assert adapter.read() == "OFLT 12"
+    with pytest.raises(AttributeError):
+        sr860.apply(capture_bytes=1)
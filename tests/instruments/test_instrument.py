@@ -249,3 +249,34 @@ def test_fakeinstrument_control(set_command, given, expected):
     fake = Fake()
     fake.x = given
     assert fake.x == expected
+
+
+def test_control_validator_map_unhashable():
+    class Fake(FakeInstrument):
+        x = Instrument.control(
+            "", "%d", "",
+            validator=strict_discrete_set,
+            values=[[4], [5], [6]],
+            map_values=True,
+        )
+
+    fake = Fake()
+    fake.x = [5]
+    assert fake.read() == '1'
+    with pytest.raises(ValueError):
+        fake.x = [20]
+
+
+def test_control_dict_map_formats_each_mapped_value():
+    class Fake(FakeInstrument):
+        x = Instrument.control(
+            "", "%s", "",
+            validator=strict_discrete_set,
+            values={'a': 1, 'b': True, 'c': 1.0},
+            map_values=True,
+        )
+
+    fake = Fake()
+    for value, command in [('a', '1'), ('b', 'True'), ('c', '1.0'), ('a', '1')]:
+        fake.x = value
+        assert fake.read() == command